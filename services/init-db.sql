@@ -22,7 +22,7 @@ CREATE TABLE IF NOT EXISTS tasks (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    INDEX idx_user_tasks (user_id, created_at),
+    INDEX idx_user_created_desc (user_id, created_at DESC),
     INDEX idx_user_status (user_id, status),
     INDEX idx_user_priority (user_id, priority),
     INDEX idx_due_date (due_date)
@@ -0,0 +1,36 @@
+-- Migration script to speed up the task list query
+-- Replaces idx_user_tasks with a descending composite index that matches
+-- "WHERE user_id = ? ORDER BY created_at DESC", so MySQL reads rows in
+-- output order instead of sorting. Safe to re-run.
+
+USE task_manager;
+
+-- Add the descending index if it doesn't exist
+SET @index_exists = (SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+                     WHERE TABLE_SCHEMA = 'task_manager'
+                     AND TABLE_NAME = 'tasks'
+                     AND INDEX_NAME = 'idx_user_created_desc');
+
+SET @query = IF(@index_exists = 0,
+    'CREATE INDEX idx_user_created_desc ON tasks(user_id, created_at DESC)',
+    'SELECT "idx_user_created_desc already exists" as status');
+
+PREPARE stmt FROM @query;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Drop the superseded ascending index if it exists
+SET @index_exists = (SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS
+                     WHERE TABLE_SCHEMA = 'task_manager'
+                     AND TABLE_NAME = 'tasks'
+                     AND INDEX_NAME = 'idx_user_tasks');
+
+SET @query = IF(@index_exists = 1,
+    'DROP INDEX idx_user_tasks ON tasks',
+    'SELECT "idx_user_tasks already dropped" as status');
+
+PREPARE stmt FROM @query;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SELECT 'Migration completed successfully!' as status;
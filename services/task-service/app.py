@@ -1,17 +1,20 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from werkzeug.middleware.proxy_fix import ProxyFix
-import mysql.connector
 from mysql.connector import pooling
 import jwt
+import orjson
 import os
 import logging
+import threading
+import time
+from collections import deque
 from functools import wraps
-from datetime import datetime
-from pydantic import BaseModel, Field, ValidationError, validator
-from typing import Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Literal, Optional
+from cachetools import TTLCache
 
 # CI/CD Pipeline Full Test - January 2026 v1.0.0 // // // //
 # Task service with automated builds and security scanning
@@ -37,48 +40,34 @@ CORS(app,
      allow_headers=['Content-Type', 'Authorization'],
      expose_headers=['Content-Type', 'Authorization'])
 
-# Rate limiting
+# Rate limiting. With redis storage the counters are shared across all
+# gunicorn workers and replicas (memory:// keeps a separate counter per
+# worker, effectively multiplying every limit)
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
     default_limits=["100 per 15 minutes"],
-    storage_uri="memory://"
+    storage_uri=os.getenv("RATELIMIT_STORAGE_URI", "memory://")
 )
 
-# Pydantic models for validation
+# Pydantic models for validation; priority/status checks live in the
+# compiled Literal schema instead of Python-level @validator hooks
 class TaskCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: str = Field(..., min_length=1, max_length=2000)
-    priority: str = Field(default='medium')
-    
-    @validator('priority')
-    def validate_priority(cls, v):
-        allowed_priorities = ['low', 'medium', 'high']
-        if v not in allowed_priorities:
-            raise ValueError(f'Priority must be one of: {", ".join(allowed_priorities)}')
-        return v
+    priority: Literal['low', 'medium', 'high'] = 'medium'
 
 class TaskUpdate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: str = Field(..., min_length=1, max_length=2000)
-    priority: Optional[str] = None
-    status: Optional[str] = None
-    
-    @validator('priority')
-    def validate_priority(cls, v):
-        if v is not None:
-            allowed_priorities = ['low', 'medium', 'high']
-            if v not in allowed_priorities:
-                raise ValueError(f'Priority must be one of: {", ".join(allowed_priorities)}')
-        return v
-    
-    @validator('status')
-    def validate_status(cls, v):
-        if v is not None:
-            allowed_statuses = ['pending', 'completed']
-            if v not in allowed_statuses:
-                raise ValueError(f'Status must be one of: {", ".join(allowed_statuses)}')
-        return v
+    priority: Optional[Literal['low', 'medium', 'high']] = None
+    status: Optional[Literal['pending', 'completed']] = None
+
+# Pre-bound core validators: model_validate hands the body dict straight to
+# the compiled pydantic-core schema, skipping __init__ keyword unpacking,
+# and turns non-dict bodies into a ValidationError instead of a TypeError
+_validate_task_create = TaskCreate.model_validate
+_validate_task_update = TaskUpdate.model_validate
 
 # Database connection pool //
 db_config = {
@@ -86,8 +75,14 @@ db_config = {
     "user": os.getenv("DB_USER", "root"),
     "password": os.getenv("DB_PASS", "password"),
     "database": os.getenv("DB_NAME", "task_manager"),
+    # Pin the session charset/collation at connect time so the server
+    # never falls back to negotiating or transcoding per connection
+    "charset": "utf8mb4",
+    "collation": "utf8mb4_unicode_ci",
     "pool_name": "task_pool",
-    "pool_size": 5
+    # Size the per-worker pool to match gunicorn's threads-per-worker so
+    # every request thread can hold a connection without queueing
+    "pool_size": int(os.getenv("DB_POOL_SIZE", os.getenv("GUNICORN_THREADS", 8)))
 }
 
 # Initialize connection pool as None, will be created on first use
@@ -102,34 +97,199 @@ def get_connection_pool():
             connection_pool = pooling.MySQLConnectionPool(**db_config)
             logger.info("MySQL connection pool created successfully")
         except Exception as e:
-            logger.error(f"Failed to create connection pool: {e}")
+            logger.error("Failed to create connection pool: %s", e)
             raise
+        _insert_batcher.start()
     return connection_pool
 
-# Ensure JWT_SECRET is set
+# Insert micro-batcher settings: how long to wait for concurrent creates
+# to pile up, and the most rows merged into one INSERT
+INSERT_BATCH_WINDOW_MS = int(os.getenv("INSERT_BATCH_WINDOW_MS", 5))
+INSERT_BATCH_MAX = 100
+# Upper bound on how long a create may wait for its flush; if the flusher
+# is gone or wedged this surfaces as a 500 instead of a stuck request
+INSERT_BATCH_WAIT_S = 10
+
+class _InsertBatcher:
+    """Coalesces concurrent task creates into one multi-row INSERT.
+
+    Each create_task call queues its row and blocks until the background
+    flusher has written the batch, so bursty create traffic shares a
+    single INSERT statement and a single commit/fsync instead of one per
+    row. Inserted ids are consecutive from lastrowid, so each caller gets
+    back its own task id.
+    """
+
+    def __init__(self):
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="insert-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def reset(self):
+        """Forget state inherited across a fork.
+
+        The flusher thread does not survive into a forked worker, so the
+        stale thread handle (and any queue snapshot copied from the
+        parent) must be cleared for start() to spawn a fresh thread.
+        """
+        with self._lock:
+            self._queue.clear()
+            self._wakeup.clear()
+            self._thread = None
+
+    def submit(self, row):
+        """Queue one (user_id, title, description, priority) row and block
+        until the flusher resolves its task id (or raises its error)."""
+        item = {"row": row, "done": threading.Event(), "task_id": None, "error": None}
+        with self._lock:
+            self._queue.append(item)
+        self._wakeup.set()
+        if not item["done"].wait(timeout=INSERT_BATCH_WAIT_S):
+            raise TimeoutError("Timed out waiting for insert batch flush")
+        if item["error"] is not None:
+            raise item["error"]
+        return item["task_id"]
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            # Short window so concurrent creates can join the batch
+            time.sleep(INSERT_BATCH_WINDOW_MS / 1000.0)
+            with self._lock:
+                count = min(len(self._queue), INSERT_BATCH_MAX)
+                batch = [self._queue.popleft() for _ in range(count)]
+                if not self._queue:
+                    self._wakeup.clear()
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            pool = get_connection_pool()
+            conn = pool.get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(
+                    "INSERT INTO tasks (user_id, title, description, priority) VALUES (%s, %s, %s, %s)",
+                    [item["row"] for item in batch]
+                )
+                conn.commit()
+                first_id = cursor.lastrowid
+                for offset, item in enumerate(batch):
+                    item["task_id"] = first_id + offset
+            finally:
+                cursor.close()
+                conn.close()
+        except Exception as e:
+            logger.error("Error flushing insert batch: %s", e)
+            for item in batch:
+                item["error"] = e
+        finally:
+            for item in batch:
+                item["done"].set()
+
+_insert_batcher = _InsertBatcher()
+
+def get_db():
+    """Check out one pooled connection per request, cached on flask.g.
+
+    Handlers that touch the database more than once reuse the same
+    connection; the teardown hook returns it to the pool when the request
+    ends, so handlers no longer close connections themselves.
+    """
+    if 'db_conn' not in g:
+        g.db_conn = get_connection_pool().get_connection()
+    return g.db_conn
+
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        try:
+            if exc is not None:
+                conn.rollback()
+            conn.close()  # returns the connection to the pool
+        except Exception as e:
+            logger.error("Error returning connection to pool: %s", e)
+
+# JWT verification key: Ed25519 (EdDSA) when JWT_PUBLIC_KEY holds a PEM
+# public key, otherwise the shared HS256 secret. The key object is built
+# once at startup so the hot path never re-parses PEM material.
+# Note: the bundled auth-service signs HS256 only (its jsonwebtoken 9.x
+# dependency has no EdDSA support), so the EdDSA path is for deployments
+# where tokens are minted by an issuer that can sign Ed25519.
+JWT_PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
 JWT_SECRET = os.getenv("JWT_SECRET")
-if not JWT_SECRET:
-    logger.critical("JWT_SECRET environment variable not set!")
-    raise ValueError("JWT_SECRET must be set")
+if JWT_PUBLIC_KEY:
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+    JWT_VERIFY_KEY = load_pem_public_key(JWT_PUBLIC_KEY.encode())
+    JWT_ALGORITHMS = ["EdDSA"]
+    logger.info("JWT verification using EdDSA public key")
+elif JWT_SECRET:
+    JWT_VERIFY_KEY = JWT_SECRET
+    JWT_ALGORITHMS = ["HS256"]
+else:
+    logger.critical("Neither JWT_PUBLIC_KEY nor JWT_SECRET is set!")
+    raise ValueError("JWT_PUBLIC_KEY or JWT_SECRET must be set")
+
+# Verified-token cache: the same browser token repeats for minutes, so skip
+# the HMAC-SHA256 + base64/JSON work on repeat hits. Entries live at most 60s
+# and the token's own exp is still enforced on every hit.
+_jwt_cache = TTLCache(maxsize=10_000, ttl=60)
+_jwt_cache_lock = threading.Lock()
+_jwt_decode = jwt.decode
 
 def verify_token(f):
+    # Bind the hot globals once per decorated view; closure cell loads are
+    # cheaper than the module-global lookups they replace on every request
+    decode = _jwt_decode
+    cache = _jwt_cache
+    cache_lock = _jwt_cache_lock
+    clock = time.time
+
     @wraps(f)
     def decorated(*args, **kwargs):
         token = request.headers.get('Authorization')
-        
+
         if not token:
             return jsonify({"error": "No token provided"}), 401
-        
+
+        # Fast path for the "Bearer <token>" shape every client sends:
+        # a startswith + slice instead of split()'s list allocation
+        if token.startswith('Bearer '):
+            token = token[7:]
+        elif ' ' in token:
+            token = token.split(' ')[1]
+
+        with cache_lock:
+            cached = cache.get(token)
+        if cached is not None and cached['exp'] > clock():
+            request.user_id = cached['userId']
+            return f(*args, **kwargs)
+
         try:
-            token = token.split(' ')[1] if ' ' in token else token
-            payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
+            payload = decode(
+                token, JWT_VERIFY_KEY, algorithms=JWT_ALGORITHMS,
+                options={"require": ["exp", "userId"]}
+            )
             request.user_id = payload['userId']
+            with cache_lock:
+                cache[token] = {'userId': payload['userId'], 'exp': payload['exp']}
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token expired"}), 401
         except jwt.InvalidTokenError:
             return jsonify({"error": "Invalid token"}), 401
         except Exception as e:
-            logger.error(f"Token verification error: {str(e)}")
+            logger.error("Token verification error: %s", e)
             return jsonify({"error": "Authentication failed"}), 401
         
         return f(*args, **kwargs)
@@ -140,105 +300,126 @@ def verify_token(f):
 def health():
     return jsonify({"status": "healthy", "service": "task-service"})
 
+# Rows fetched (and serialized) per chunk when streaming the task list
+TASK_STREAM_CHUNK = 500
+
 @app.route('/api/tasks', methods=['GET'])
 @verify_token
 def get_tasks():
+    user_id = request.user_id
     try:
-        pool = get_connection_pool()
-        conn = pool.get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute(
-            "SELECT * FROM tasks WHERE user_id = %s ORDER BY created_at DESC",
-            (request.user_id,)
-        )
-        tasks = cursor.fetchall()
-        
-        cursor.close()
-        conn.close()
-        
-        return jsonify(tasks)
+        # Dedicated checkout: the generator below outlives the request
+        # context, so it can't lean on the g-scoped connection
+        conn = get_connection_pool().get_connection()
     except Exception as e:
-        print(f"Error fetching tasks: {e}")
+        logger.error("Error fetching tasks: %s", e)
         return jsonify({"error": "Failed to fetch tasks"}), 500
 
+    def generate():
+        cursor = None
+        try:
+            # The default unbuffered cursor leaves rows on the wire until
+            # fetchmany pulls them
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                "SELECT id, title, description, priority, status, due_date, created_at, updated_at "
+                "FROM tasks WHERE user_id = %s ORDER BY created_at DESC",
+                (user_id,)
+            )
+
+            # Emit the JSON array in TASK_STREAM_CHUNK-row pieces instead of
+            # materializing and serializing the full result in memory;
+            # orjson handles the row dicts (datetimes included) in C
+            yield b"["
+            first = True
+            dumps = orjson.dumps
+            fetchmany = cursor.fetchmany
+            while True:
+                rows = fetchmany(TASK_STREAM_CHUNK)
+                if not rows:
+                    break
+                chunk = b",".join(dumps(row) for row in rows)
+                yield chunk if first else b"," + chunk
+                first = False
+            yield b"]"
+        finally:
+            if cursor is not None:
+                cursor.close()
+            conn.close()
+
+    return app.response_class(generate(), mimetype='application/json')
+
 @app.route('/api/tasks', methods=['POST'])
 @verify_token
 @limiter.limit("20 per minute")
 def create_task():
+    # get_json(cache=True) parses the body once and memoizes it on the
+    # request; silent=True turns malformed JSON into None instead of a 400
+    # raised mid-parse, so it falls through to our own error response
+    body = request.get_json(cache=True, silent=True)
     try:
         # Validate input with Pydantic
-        task_data = TaskCreate(**request.json)
+        task_data = _validate_task_create(body)
     except ValidationError as e:
         return jsonify({"error": e.errors()[0]['msg']}), 400
     except Exception:
         return jsonify({"error": "Invalid request data"}), 400
     
     try:
-        pool = get_connection_pool()
-        conn = pool.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "INSERT INTO tasks (user_id, title, description, priority) VALUES (%s, %s, %s, %s)",
+        # Make sure the pool (and with it the batcher thread) exists, then
+        # hand the row to the micro-batcher and wait for its id
+        get_connection_pool()
+        task_id = _insert_batcher.submit(
             (request.user_id, task_data.title, task_data.description, task_data.priority)
         )
-        conn.commit()
-        task_id = cursor.lastrowid
-        
-        cursor.close()
-        conn.close()
-        
-        logger.info(f"Task created successfully with ID {task_id}")
+
+        logger.info("Task created successfully with ID %s", task_id)
         return jsonify({"message": "Task created", "taskId": task_id}), 201
     except Exception as e:
-        logger.error(f"Error creating task: {str(e)}")
+        logger.error("Error creating task: %s", e)
         return jsonify({"error": "Failed to create task"}), 500
 
 @app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
 @verify_token
 def delete_task(task_id):
     try:
-        pool = get_connection_pool()
-        conn = pool.get_connection()
+        conn = get_db()
         cursor = conn.cursor()
-        
+
         cursor.execute(
             "DELETE FROM tasks WHERE id = %s AND user_id = %s",
             (task_id, request.user_id)
         )
         conn.commit()
-        
+
         if cursor.rowcount == 0:
             cursor.close()
-            conn.close()
             return jsonify({"error": "Task not found"}), 404
-        
+
         cursor.close()
-        conn.close()
-        
+
         return jsonify({"message": "Task deleted"})
     except Exception as e:
-        print(f"Error deleting task: {e}")
+        logger.error("Error deleting task: %s", e)
         return jsonify({"error": "Failed to delete task"}), 500
 
 @app.route('/api/tasks/<int:task_id>', methods=['PUT'])
 @verify_token
 @limiter.limit("30 per minute")
 def update_task(task_id):
+    body = request.get_json(cache=True, silent=True)
     try:
         # Validate input with Pydantic
-        task_data = TaskUpdate(**request.json)
+        task_data = _validate_task_update(body)
     except ValidationError as e:
         return jsonify({"error": e.errors()[0]['msg']}), 400
     except Exception:
         return jsonify({"error": "Invalid request data"}), 400
     
     try:
-        pool = get_connection_pool()
-        conn = pool.get_connection()
+        conn = get_db()
         cursor = conn.cursor()
-        
+
         query = "UPDATE tasks SET title = %s, description = %s"
         params = [task_data.title, task_data.description]
         
@@ -255,60 +436,138 @@ def update_task(task_id):
         
         cursor.execute(query, params)
         conn.commit()
-        
+
         if cursor.rowcount == 0:
             cursor.close()
-            conn.close()
             return jsonify({"error": "Task not found"}), 404
-        
+
         cursor.close()
-        conn.close()
-        
-        logger.info(f"Task {task_id} updated successfully")
+
+        logger.info("Task %s updated successfully", task_id)
         return jsonify({"message": "Task updated"})
     except Exception as e:
-        logger.error(f"Error updating task: {str(e)}")
+        logger.error("Error updating task: %s", e)
         return jsonify({"error": "Failed to update task"}), 500
 
 @app.route('/api/tasks/<int:task_id>/status', methods=['PATCH'])
 @verify_token
 def toggle_task_status(task_id):
     try:
-        pool = get_connection_pool()
-        conn = pool.get_connection()
+        conn = get_db()
         cursor = conn.cursor()
-        
-        # Get current status
+
+        # Flip the status in one atomic UPDATE instead of SELECT-then-UPDATE,
+        # halving the round trips and removing the read-modify-write race
         cursor.execute(
-            "SELECT status FROM tasks WHERE id = %s AND user_id = %s",
+            "UPDATE tasks SET status = IF(status = 'pending', 'completed', 'pending') "
+            "WHERE id = %s AND user_id = %s",
             (task_id, request.user_id)
         )
-        result = cursor.fetchone()
-        
-        if not result:
+        conn.commit()
+
+        if cursor.rowcount == 0:
             cursor.close()
-            conn.close()
             return jsonify({"error": "Task not found"}), 404
-        
-        current_status = result[0]
-        new_status = 'completed' if current_status == 'pending' else 'pending'
-        
-        # Update status
-        cursor.execute(
-            "UPDATE tasks SET status = %s WHERE id = %s AND user_id = %s",
-            (new_status, task_id, request.user_id)
-        )
-        conn.commit()
-        
+
         cursor.close()
-        conn.close()
-        
-        logger.info(f"Task {task_id} status toggled to {new_status}")
-        return jsonify({"message": "Status updated", "status": new_status})
+
+        logger.info("Task %s status toggled", task_id)
+        return jsonify({"message": "Status updated"})
     except Exception as e:
-        logger.error(f"Error toggling status: {str(e)}")
+        logger.error("Error toggling status: %s", e)
         return jsonify({"error": "Failed to update status"}), 500
 
+@app.route('/api/tasks/batch', methods=['POST'])
+@verify_token
+@limiter.limit("20 per minute")
+def batch_tasks():
+    data = request.get_json(cache=True, silent=True)
+    ops = data.get('ops') if isinstance(data, dict) else None
+    if not isinstance(ops, list) or not ops:
+        return jsonify({"error": "Request body must contain a non-empty 'ops' array"}), 400
+    if len(ops) > 100:
+        return jsonify({"error": "Batch is limited to 100 operations"}), 400
+
+    # Validate every op up front so only good rows reach the transaction;
+    # invalid items get a per-item error without failing the whole batch
+    results = [None] * len(ops)
+    creates = []   # (result index, TaskCreate)
+    updates = []   # (result index, task id, TaskUpdate)
+    deletes = []   # (result index, task id)
+    for i, op in enumerate(ops):
+        try:
+            fields = {k: v for k, v in op.items() if k not in ('op', 'id')}
+            action = op.get('op')
+            if action == 'create':
+                creates.append((i, _validate_task_create(fields)))
+            elif action == 'update':
+                updates.append((i, int(op['id']), _validate_task_update(fields)))
+            elif action == 'delete':
+                deletes.append((i, int(op['id'])))
+            else:
+                results[i] = {"status": 400, "error": "op must be create, update or delete"}
+        except ValidationError as e:
+            results[i] = {"status": 400, "error": e.errors()[0]['msg']}
+        except Exception:
+            results[i] = {"status": 400, "error": "Invalid operation data"}
+
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+
+        try:
+            conn.start_transaction()
+
+            if creates:
+                # Single multi-row INSERT; ids are consecutive from lastrowid
+                cursor.executemany(
+                    "INSERT INTO tasks (user_id, title, description, priority) VALUES (%s, %s, %s, %s)",
+                    [(request.user_id, t.title, t.description, t.priority) for _, t in creates]
+                )
+                first_id = cursor.lastrowid
+                for offset, (i, _) in enumerate(creates):
+                    results[i] = {"status": 201, "taskId": first_id + offset}
+
+            for i, batch_task_id, t in updates:
+                query = "UPDATE tasks SET title = %s, description = %s"
+                params = [t.title, t.description]
+                if t.priority:
+                    query += ", priority = %s"
+                    params.append(t.priority)
+                if t.status:
+                    query += ", status = %s"
+                    params.append(t.status)
+                query += " WHERE id = %s AND user_id = %s"
+                params.extend([batch_task_id, request.user_id])
+                cursor.execute(query, params)
+                if cursor.rowcount == 0:
+                    results[i] = {"status": 404, "error": "Task not found"}
+                else:
+                    results[i] = {"status": 200}
+
+            for i, batch_task_id in deletes:
+                cursor.execute(
+                    "DELETE FROM tasks WHERE id = %s AND user_id = %s",
+                    (batch_task_id, request.user_id)
+                )
+                if cursor.rowcount == 0:
+                    results[i] = {"status": 404, "error": "Task not found"}
+                else:
+                    results[i] = {"status": 200}
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        logger.info("Batch of %d task operations executed", len(ops))
+        return jsonify({"results": results})
+    except Exception as e:
+        logger.error("Error executing task batch: %s", e)
+        return jsonify({"error": "Failed to execute batch"}), 500
+
 # Error handlers
 @app.errorhandler(429)
 def ratelimit_handler(e):
@@ -316,10 +575,11 @@ def ratelimit_handler(e):
 
 @app.errorhandler(500)
 def internal_error(e):
-    logger.error(f"Internal server error: {str(e)}")
+    logger.error("Internal server error: %s", e)
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == '__main__':
-    logger.info("Starting task service...")
-    logger.info(f"Environment: {os.getenv('NODE_ENV', 'development')}")
+    # Local development only - production runs under gunicorn (see gunicorn.conf.py)
+    logger.info("Starting task service (dev server)...")
+    logger.info("Environment: %s", os.getenv('NODE_ENV', 'development'))
     app.run(host='0.0.0.0', port=int(os.getenv('PORT', 8002)))
@@ -0,0 +1,35 @@
+import os
+
+# Bind to the same port the dev server used
+bind = f"0.0.0.0:{os.getenv('PORT', 8002)}"
+
+# Worker pool sizing: threaded workers because the task service is I/O bound
+# on MySQL round-trips
+workers = int(os.getenv('GUNICORN_WORKERS', 2 * (os.cpu_count() or 1) + 1))
+worker_class = "gthread"
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+worker_connections = 1000
+
+# Load the app once in the master so module-level setup (logging, JWT_SECRET
+# check) runs a single time before forking
+preload_app = True
+
+# Match the app's logging setup
+loglevel = os.getenv('LOG_LEVEL', 'info')
+accesslog = '-'
+errorlog = '-'
+
+graceful_timeout = 30
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+
+
+def post_fork(server, worker):
+    """Drop state inherited from the preloaded master.
+
+    The MySQL connection pool must not share sockets across forked
+    workers, and the insert batcher's flusher thread does not survive the
+    fork; each worker re-creates both lazily on first use.
+    """
+    import app
+    app.connection_pool = None
+    app._insert_batcher.reset()